@@ -1,6 +1,13 @@
 import logging, sys
+from socket import IPPROTO_TCP, SOL_SOCKET, SO_RCVBUF, SO_SNDBUF, TCP_NODELAY
 from socketserver import BaseRequestHandler
-from threading import Lock
+
+import _indexer_core
+
+
+# Configured once at import time rather than per connection. Per-request logging is at DEBUG, so a saturated
+# server does not spend CPU formatting log records nobody reads.
+logging.basicConfig(stream = sys.stdout, level = logging.WARNING)
 
 
 class PackageIndexer(BaseRequestHandler):
@@ -8,40 +15,68 @@ class PackageIndexer(BaseRequestHandler):
     # This should be a power of 2 for best performance.
     TCP_SOCKET_BUFFER_BYTES = 4096
 
-    # Request message formatting parameters.
-    REQ_TOKEN_SEPARATOR = b'|'
-    REQ_DEPS_SEPARATOR = b','
+    # Size of the kernel receive and send buffers of accepted connections.
+    SOCKET_KERNEL_BUFFER_BYTES = 65536
+
+    # The protocol constants and the index state live in _indexer_core (which can be AOT-compiled with mypyc);
+    # they are aliased here for the convenience of existing callers.
+    REQ_TOKEN_SEPARATOR = _indexer_core.REQ_TOKEN_SEPARATOR
+    REQ_DEPS_SEPARATOR = _indexer_core.REQ_DEPS_SEPARATOR
+    CMD_INDEX = _indexer_core.CMD_INDEX
+    CMD_REMOVE = _indexer_core.CMD_REMOVE
+    CMD_QUERY = _indexer_core.CMD_QUERY
+    RES_OK = _indexer_core.RES_OK
+    RES_FAIL = _indexer_core.RES_FAIL
+    RES_ERROR = _indexer_core.RES_ERROR
+    RES_OK_NL = _indexer_core.RES_OK_NL
+    RES_FAIL_NL = _indexer_core.RES_FAIL_NL
+    RES_ERROR_NL = _indexer_core.RES_ERROR_NL
+    PACKAGES = _indexer_core.PACKAGES
+    DEP_COUNT = _indexer_core.DEP_COUNT
 
-    # Request commands.
-    CMD_INDEX = b'INDEX'
-    CMD_REMOVE = b'REMOVE'
-    CMD_QUERY = b'QUERY'
+    NEWLINE = b'\n'
 
-    # Responses.
-    RES_OK = b'OK'
-    RES_FAIL = b'FAIL'
-    RES_ERROR = b'ERROR'
+    # Maps each command to its handler method name and whether the command accepts dependencies. A single dict
+    # lookup replaces a chain of bytes comparisons on the hot path. Dispatch goes through the instance so the
+    # handler methods can be overridden (or patched in tests).
+    _DISPATCH = {
+        CMD_INDEX: ('indexPackage', True),
+        CMD_REMOVE: ('removePackage', False),
+        CMD_QUERY: ('queryPackage', False),
+    }
 
-    NEWLINE = b'\n'
 
-    # This is a hash map from each indexed package to its set of dependencies.
-    PACKAGES = {}
+    def __init__(self, request = None, client_address = None, server = None):
+        self.logger = logging.getLogger(type(self).__name__)
 
-    # This is a hash map from each indexed package to the packages which depend on it.
-    DEPS = {}
+        # Received data is buffered across receiveRequest calls, so a packet carrying the beginning of the next
+        # request is not lost and pipelined requests can be processed in one batch.
+        self.recvBuffer = bytearray()
 
-    LOCK = Lock()
+        # When no request is passed, the indexer is used as a standalone request processor (e.g. by the asyncio
+        # server in PackageIndexerMain), so the socketserver handler machinery must not run.
+        if request is not None:
+            super().__init__(request, client_address, server)
 
 
-    def __init__(self, request, client_address, server):
-        self.logger = logging.getLogger(type(self).__name__)
-        logging.basicConfig(stream = sys.stdout, level = logging.INFO)
+    @staticmethod
+    def configureSocket(sock):
+        '''Applies per-connection socket tuning for this small-message request/response protocol.
+
+        Nagle's algorithm is disabled since it would delay our small responses waiting for more data to coalesce,
+        and the kernel buffers are sized explicitly rather than left to auto-tuning.'''
+
+        sock.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
+        sock.setsockopt(SOL_SOCKET, SO_RCVBUF, PackageIndexer.SOCKET_KERNEL_BUFFER_BYTES)
+        sock.setsockopt(SOL_SOCKET, SO_SNDBUF, PackageIndexer.SOCKET_KERNEL_BUFFER_BYTES)
+
 
-        super().__init__(request, client_address, server)
+    def setup(self):
+        PackageIndexer.configureSocket(self.request)
 
 
     def numIndexedPackages(self):
-        return len(PackageIndexer.PACKAGES)
+        return len(_indexer_core.PACKAGES)
 
 
     def handle(self):
@@ -55,126 +90,99 @@ class PackageIndexer(BaseRequestHandler):
 
 
     def receiveRequest(self):
-        # Keep receiving data packets until newline terminates it.
-        data = b''
+        # Keep receiving data packets until the buffer holds at least one complete request. The buffer carried over
+        # from the previous call never contains a newline (the batch loop below consumes through the last one), so
+        # only each newly received packet needs scanning, not the whole buffer again.
         while True:
             packet = self.request.recv(PackageIndexer.TCP_SOCKET_BUFFER_BYTES)
-            data += packet
-            if len(packet) == 0 or packet[-1 : ] == PackageIndexer.NEWLINE:
+            if len(packet) == 0:
+                if len(self.recvBuffer) == 0:
+                    raise ConnectionAbortedError
+                # The connection closed in the middle of a request, so the partial request is invalid.
+                self.recvBuffer.clear()
+                self.request.sendall(PackageIndexer.RES_ERROR_NL)
+                raise ConnectionAbortedError
+            self.recvBuffer.extend(packet)
+            if PackageIndexer.NEWLINE in packet:
                 break
 
-        if len(data) == 0:
-            raise ConnectionAbortedError
+        # Log client request. The lazy %-style arguments are only formatted if the DEBUG level is enabled.
+        self.logger.debug(
+            'Request from %s:%d received: %r', self.client_address[0], self.client_address[1], self.recvBuffer)
 
-        # Log client request.
-        self.logger.info(
-            'Request from %s:%d received: %s' % (self.client_address[0], self.client_address[1], repr(data)))
-
-        # If the request message does not end with a newline, or there is a newline somewhere else than at the end,
-        # it is invalid. Otherwise, we process the request.
-        if data[-1 : ] != PackageIndexer.NEWLINE:
-            responseMsg = PackageIndexer.RES_ERROR
-        else:
-            requestMsg = data.strip()  # Chop off the leading and trailing whitespace.
-            if PackageIndexer.NEWLINE in requestMsg:
-                responseMsg = PackageIndexer.RES_ERROR
-            else:
-                responseMsg = self.processRequest(requestMsg)
+        # Clients may pipeline several requests back-to-back, so process every complete request in the buffer and
+        # batch the responses into a single send. An incomplete trailing request stays buffered for the next call.
+        reply = bytearray()
+        start = 0
+        while True:
+            newlineIndex = self.recvBuffer.find(PackageIndexer.NEWLINE, start)
+            if newlineIndex < 0:
+                break
+            requestMsg = bytes(self.recvBuffer[start : newlineIndex]).strip()  # Chop off the whitespace.
+            start = newlineIndex + 1
+            reply.extend(self.processRequest(requestMsg))  # Responses are pre-terminated with a newline.
+        del self.recvBuffer[ : start]  # Compact the buffer once per batch.
 
-        # Send back the response.
-        res = responseMsg + PackageIndexer.NEWLINE
-        self.logger.info('Response: %s' % res)
-        self.request.send(res)
+        # Send back the batched responses.
+        self.logger.debug('Response: %r', reply)
+        self.request.sendall(reply)
 
 
     def processRequest(self, requestMsg):
         '''This method dispatches the passed request message to the appropriate handler based on the command.'''
 
-        # Split the request message into tokens.
-        tokens = requestMsg.split(PackageIndexer.REQ_TOKEN_SEPARATOR)
-        if len(tokens) != 3:
-            return PackageIndexer.RES_ERROR
+        # Split the request message into tokens. The split is bounded so a malformed message full of separators is
+        # rejected without materializing a token list proportional to its length; a separator left over in the
+        # dependencies token means there were more than three fields, which is equally invalid.
+        tokens = requestMsg.split(PackageIndexer.REQ_TOKEN_SEPARATOR, 2)
+        if len(tokens) != 3 or PackageIndexer.REQ_TOKEN_SEPARATOR in tokens[2]:
+            return PackageIndexer.RES_ERROR_NL
         cmd, name, deps = tokens[0], tokens[1], self.parseDepsToken(tokens[2])
 
         # Verify package and dependency names.
         if not self.isPackageNameValid(name):
-            return PackageIndexer.RES_ERROR  # Invalid package name.
+            return PackageIndexer.RES_ERROR_NL  # Invalid package name.
         for dep in deps:
             if not self.isPackageNameValid(dep):
-                return PackageIndexer.RES_ERROR  # Invalid dependency name.
+                return PackageIndexer.RES_ERROR_NL  # Invalid dependency name.
 
         # Dispatch the command.
-        if cmd == PackageIndexer.CMD_INDEX:
-            return self.indexPackage(name, deps)
-        elif cmd == PackageIndexer.CMD_REMOVE:
-            if len(deps) > 0:
-                return PackageIndexer.RES_ERROR  # Dependencies should not be specified for the REMOVE command.
-            return self.removePackage(name)
-        elif cmd == PackageIndexer.CMD_QUERY:
-            if len(deps) > 0:
-                return PackageIndexer.RES_ERROR  # Dependencies should not be specified for the QUERY command.
-            return self.queryPackage(name)
-        else:
-            return PackageIndexer.RES_ERROR  # Invalid command.
+        dispatchEntry = PackageIndexer._DISPATCH.get(cmd)
+        if dispatchEntry is None:
+            return PackageIndexer.RES_ERROR_NL  # Invalid command.
+        handlerName, allowsDeps = dispatchEntry
+        if allowsDeps:
+            return getattr(self, handlerName)(name, deps)
+        if len(deps) > 0:
+            return PackageIndexer.RES_ERROR_NL  # Dependencies should not be specified for this command.
+        return getattr(self, handlerName)(name)
 
 
     def parseDepsToken(self, depsToken):
-        '''Returns a set containing all dependencies in the passed token.'''
+        '''Returns a frozenset containing all dependencies in the passed token. See _indexer_core.parseDepsToken.'''
 
-        if len(depsToken) == 0:
-            return set()  # No dependencies.
-        return set(depsToken.split(PackageIndexer.REQ_DEPS_SEPARATOR))
+        return _indexer_core.parseDepsToken(depsToken)
 
 
     def isPackageNameValid(self, name):
-        return len(name) > 0
+        if isinstance(name, str):
+            name = name.encode()  # Accept str names for convenience; the core operates on bytes.
+        return _indexer_core.isPackageNameValid(name)
 
 
     def indexPackage(self, name, deps):
         '''Handler method for the INDEX command.'''
 
-        with PackageIndexer.LOCK:
-            # Check that every package dependency is indexed and that the package does not depend on itself.
-            for dep in deps:
-                if dep not in PackageIndexer.PACKAGES or dep == name:
-                    return PackageIndexer.RES_FAIL
-
-            if name in PackageIndexer.PACKAGES:
-                # Remove the package as a dependency for the packages on which it no longer depends.
-                for dep in PackageIndexer.PACKAGES[name] - deps:
-                    PackageIndexer.DEPS[dep].remove(name)  # Removing an element from a set is O(1) operation.
-
-            # Index the package or update its set of dependecies.
-            PackageIndexer.PACKAGES[name] = deps
-
-            # Add the package as a dependency for the packages on which it depends.
-            for dep in deps:
-                if dep not in PackageIndexer.DEPS:
-                    PackageIndexer.DEPS[dep] = set()
-                PackageIndexer.DEPS[dep].add(name)  # Re-adding an existing element to a set has no effect.
-
-            return PackageIndexer.RES_OK
+        return _indexer_core.indexPackage(name, deps)
 
 
     def removePackage(self, name):
         '''Handler method for the REMOVE command.'''
 
-        with PackageIndexer.LOCK:
-            if name not in PackageIndexer.PACKAGES:
-                return PackageIndexer.RES_OK  # Package is not indexed.
-            if name in PackageIndexer.DEPS and len(PackageIndexer.DEPS[name]) > 0:
-                return PackageIndexer.RES_FAIL  # Other package(s) depend on this package.
-
-            # Remove the package from the index.
-            for dep in PackageIndexer.PACKAGES[name]:
-                PackageIndexer.DEPS[dep].remove(name)  # Removing an element from a set is O(1) operation.
-            del PackageIndexer.PACKAGES[name]
-
-            return PackageIndexer.RES_OK
+        return _indexer_core.removePackage(name)
 
 
     def queryPackage(self, name):
         '''Handler method for the QUERY command.'''
 
-        with PackageIndexer.LOCK:
-            return PackageIndexer.RES_OK if name in PackageIndexer.PACKAGES else PackageIndexer.RES_FAIL
+        return _indexer_core.queryPackage(name)
@@ -1,7 +1,15 @@
 #!/usr/bin/env python3
 
 
-import socketserver
+import asyncio, multiprocessing, os, signal, socket, sys
+from threading import Thread
+
+# uvloop implements the event loop on top of libuv, which is substantially faster than the default selector loop
+# on small-message TCP workloads like ours. It is optional; without it the stdlib loop is used.
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 from PackageIndexer import PackageIndexer
 
@@ -9,11 +17,117 @@ from PackageIndexer import PackageIndexer
 SERVER_ADDRESS = 'localhost'
 SERVER_PORT = 8080
 
+# Upper bound on a single buffered request line. The protocol defines no maximum message length and an INDEX
+# request may carry thousands of dependencies, so this is sized generously; the stream reader's 64 KiB default
+# would reject such requests that the socketserver path accepts.
+STREAM_READER_LIMIT_BYTES = 16 * 1024 * 1024
+
+# Each worker process runs its own event loop and accepts on its own SO_REUSEPORT listening socket, but the
+# workers do not share the index state, while the protocol promises one consistent index across all clients (a
+# REMOVE must fail while any client's package depends on the removed one). Until the index is shared between
+# processes, a single worker is the only correct configuration; raise this (e.g. to os.cpu_count()) once it is.
+N_WORKERS = 1
+
+
+# A single indexer instance processes every request. The event loop is single-threaded, so the handler coroutines
+# of different clients never run concurrently.
+INDEXER = PackageIndexer()
+
+
+async def handleClient(reader, writer):
+    '''Coroutine serving one client connection. The connection persists across multiple requests.'''
+
+    PackageIndexer.configureSocket(writer.get_extra_info('socket'))
+
+    try:
+        while True:
+            try:
+                data = await reader.readuntil(PackageIndexer.NEWLINE)
+            except asyncio.IncompleteReadError as err:
+                # The client closed the connection. A partial trailing request is invalid and gets an ERROR
+                # response, matching the socketserver path.
+                if len(err.partial) > 0:
+                    writer.write(PackageIndexer.RES_ERROR_NL)
+                break
+            except asyncio.LimitOverrunError:
+                writer.write(PackageIndexer.RES_ERROR_NL)  # Request message is too long.
+                break
+
+            responseMsg = INDEXER.processRequest(data.strip())
+            writer.write(responseMsg)  # Responses are pre-terminated with a newline.
+            await writer.drain()
+    except OSError:
+        pass  # The connection was dropped abruptly (reset, broken pipe); there is nobody left to answer.
+
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+
+
+def createListenSocket():
+    '''Creates the listening socket.
+
+    SO_REUSEPORT lets multiple server processes accept on the same port, with the kernel load-balancing incoming
+    connections between them instead of all processes contending on a single accept queue.'''
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((SERVER_ADDRESS, SERVER_PORT))
+    sock.listen()
+    return sock
+
+
+async def runServer():
+    server = await asyncio.start_server(handleClient, sock = createListenSocket(), limit = STREAM_READER_LIMIT_BYTES)
+    async with server:
+        await server.serve_forever()
+
+
+def watchParent(parentAliveReadFd):
+    '''Blocks until the main process dies, then exits the worker.
+
+    The read only returns once the pipe's write end — held exclusively by the main process — closes, which the
+    kernel guarantees on any death of the main process, including SIGKILL that no signal handler can catch.'''
+
+    os.read(parentAliveReadFd, 1)
+    os._exit(0)
+
+
+def runWorker(parentAliveReadFd, parentAliveWriteFd):
+    os.close(parentAliveWriteFd)  # Only the main process may hold the write end, or EOF would never arrive.
+    Thread(target = watchParent, args = (parentAliveReadFd,), daemon = True).start()
+
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    asyncio.run(runServer())
+
 
 def main():
-    server = socketserver.ThreadingTCPServer(
-        server_address = (SERVER_ADDRESS, SERVER_PORT), RequestHandlerClass = PackageIndexer)
-    server.serve_forever()
+    # The kernel load-balances incoming connections between the workers' listening sockets. The workers are
+    # daemonized, torn down on SIGTERM/SIGINT, and watch a parent-death pipe, so stopping the main process by any
+    # means cannot orphan a worker that keeps serving and holding the port.
+    parentAliveReadFd, parentAliveWriteFd = os.pipe()
+    workers = [
+        multiprocessing.Process(target = runWorker, args = (parentAliveReadFd, parentAliveWriteFd), daemon = True)
+        for _ in range(N_WORKERS)]
+    for worker in workers:
+        worker.start()
+
+    def terminateWorkers(signum, frame):
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, terminateWorkers)
+    signal.signal(signal.SIGINT, terminateWorkers)
+
+    for worker in workers:
+        worker.join()
 
 if __name__ == '__main__':
     main()
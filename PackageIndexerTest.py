@@ -32,80 +32,98 @@ class PackageIndexerTest(unittest.TestCase):
 
 
     @patch.object(socket, 'recv')
-    @patch.object(PackageIndexer, 'processRequest', return_value = b'response')
-    @patch.object(socket, 'send')
-    def testReceiveRequest(self, sendMock, processRequestMock, recvMock):
+    @patch.object(PackageIndexer, 'processRequest', return_value = b'response\n')
+    @patch.object(socket, 'sendall')
+    def testReceiveRequest(self, sendallMock, processRequestMock, recvMock):
         # Empty message.
         recvMock.return_value = b''
         self.assertRaises(ConnectionAbortedError, self.indexer.receiveRequest)
         recvMock.assert_called_once_with(PackageIndexer.TCP_SOCKET_BUFFER_BYTES)
         self.assertFalse(processRequestMock.called)
-        self.assertFalse(sendMock.called)
+        self.assertFalse(sendallMock.called)
 
-        # Malformed message comes in 1 packet.
+        # Connection closes in the middle of a request.
         recvMock.reset_mock()
-        sendMock.reset_mock()
-        recvMock.side_effect = [b'bad\nMsg\n']
-        self.indexer.receiveRequest()
-        recvMock.assert_called_once_with(PackageIndexer.TCP_SOCKET_BUFFER_BYTES)
-        self.assertFalse(processRequestMock.called)
-        sendMock.assert_called_once_with(PackageIndexer.RES_ERROR + PackageIndexer.NEWLINE)
-
-        # Malformed message comes in 2 packets.
-        recvMock.reset_mock()
-        sendMock.reset_mock()
-        recvMock.side_effect = [b'bad\nMsg1', b'badMsg2\n']
-        self.indexer.receiveRequest()
+        recvMock.side_effect = [b'partial', b'']
+        self.assertRaises(ConnectionAbortedError, self.indexer.receiveRequest)
         recvMock.assert_has_calls([call(PackageIndexer.TCP_SOCKET_BUFFER_BYTES)] * 2)
         self.assertFalse(processRequestMock.called)
-        sendMock.assert_called_once_with(PackageIndexer.RES_ERROR + PackageIndexer.NEWLINE)
+        sendallMock.assert_called_once_with(PackageIndexer.RES_ERROR_NL)
 
         # Message comes in 1 packet.
         recvMock.reset_mock()
-        sendMock.reset_mock()
+        sendallMock.reset_mock()
         recvMock.side_effect = [b'msg\n']
         self.indexer.receiveRequest()
         recvMock.assert_called_once_with(PackageIndexer.TCP_SOCKET_BUFFER_BYTES)
         processRequestMock.assert_called_once_with(b'msg')
-        sendMock.assert_called_once_with(b'response' + PackageIndexer.NEWLINE)
+        sendallMock.assert_called_once_with(b'response\n')
 
         # Message comes in 2 packets.
         recvMock.reset_mock()
         processRequestMock.reset_mock()
-        sendMock.reset_mock()
+        sendallMock.reset_mock()
         recvMock.side_effect = [b'msg1', b'msg2\n']
         self.indexer.receiveRequest()
         recvMock.assert_has_calls([call(PackageIndexer.TCP_SOCKET_BUFFER_BYTES)] * 2)
         processRequestMock.assert_called_once_with(b'msg1msg2')
-        sendMock.assert_called_once_with(b'response' + PackageIndexer.NEWLINE)
+        sendallMock.assert_called_once_with(b'response\n')
+
+        # Two pipelined messages come in 1 packet and are answered with a single batched send.
+        recvMock.reset_mock()
+        processRequestMock.reset_mock()
+        sendallMock.reset_mock()
+        recvMock.side_effect = [b'msgA\nmsgB\n']
+        self.indexer.receiveRequest()
+        recvMock.assert_called_once_with(PackageIndexer.TCP_SOCKET_BUFFER_BYTES)
+        processRequestMock.assert_has_calls([call(b'msgA'), call(b'msgB')])
+        sendallMock.assert_called_once_with(b'response\nresponse\n')
+
+        # A complete message followed by the beginning of the next one; the remainder stays buffered and is
+        # processed on the next call.
+        recvMock.reset_mock()
+        processRequestMock.reset_mock()
+        sendallMock.reset_mock()
+        recvMock.side_effect = [b'msgA\nmsg', b'B\n']
+        self.indexer.receiveRequest()
+        recvMock.assert_called_once_with(PackageIndexer.TCP_SOCKET_BUFFER_BYTES)
+        processRequestMock.assert_called_once_with(b'msgA')
+        sendallMock.assert_called_once_with(b'response\n')
+
+        processRequestMock.reset_mock()
+        sendallMock.reset_mock()
+        self.indexer.receiveRequest()
+        recvMock.assert_has_calls([call(PackageIndexer.TCP_SOCKET_BUFFER_BYTES)] * 2)
+        processRequestMock.assert_called_once_with(b'msgB')
+        sendallMock.assert_called_once_with(b'response\n')
 
 
     def testProcessRequest_Errors(self):
-        self.assertEqual(self.indexer.processRequest(b''), PackageIndexer.RES_ERROR)
-        self.assertEqual(self.indexer.processRequest(b' '), PackageIndexer.RES_ERROR)
-        self.assertEqual(self.indexer.processRequest(b'|'), PackageIndexer.RES_ERROR)
-        self.assertEqual(self.indexer.processRequest(b'||'), PackageIndexer.RES_ERROR)
-        self.assertEqual(self.indexer.processRequest(b'|||'), PackageIndexer.RES_ERROR)
+        self.assertEqual(self.indexer.processRequest(b''), PackageIndexer.RES_ERROR_NL)
+        self.assertEqual(self.indexer.processRequest(b' '), PackageIndexer.RES_ERROR_NL)
+        self.assertEqual(self.indexer.processRequest(b'|'), PackageIndexer.RES_ERROR_NL)
+        self.assertEqual(self.indexer.processRequest(b'||'), PackageIndexer.RES_ERROR_NL)
+        self.assertEqual(self.indexer.processRequest(b'|||'), PackageIndexer.RES_ERROR_NL)
 
         # Package name not specified.
-        self.assertEqual(self.indexer.processRequest(b'INDEX|||'), PackageIndexer.RES_ERROR)
-        self.assertEqual(self.indexer.processRequest(b'REMOVE|||'), PackageIndexer.RES_ERROR)
-        self.assertEqual(self.indexer.processRequest(b'QUERY|||'), PackageIndexer.RES_ERROR)
+        self.assertEqual(self.indexer.processRequest(b'INDEX|||'), PackageIndexer.RES_ERROR_NL)
+        self.assertEqual(self.indexer.processRequest(b'REMOVE|||'), PackageIndexer.RES_ERROR_NL)
+        self.assertEqual(self.indexer.processRequest(b'QUERY|||'), PackageIndexer.RES_ERROR_NL)
 
         # Invalid command.
-        self.assertEqual(self.indexer.processRequest(b'index|pckg|dep'), PackageIndexer.RES_ERROR)
-        self.assertEqual(self.indexer.processRequest(b'INDEXX|pckg|dep'), PackageIndexer.RES_ERROR)
+        self.assertEqual(self.indexer.processRequest(b'index|pckg|dep'), PackageIndexer.RES_ERROR_NL)
+        self.assertEqual(self.indexer.processRequest(b'INDEXX|pckg|dep'), PackageIndexer.RES_ERROR_NL)
 
         # Invalid package name.
-        self.assertEqual(self.indexer.processRequest(b'INDEX||dep'), PackageIndexer.RES_ERROR)
+        self.assertEqual(self.indexer.processRequest(b'INDEX||dep'), PackageIndexer.RES_ERROR_NL)
 
         # Invalid dependencies.
-        self.assertEqual(self.indexer.processRequest(b'INDEX|pckg|dep,'), PackageIndexer.RES_ERROR)
-        self.assertEqual(self.indexer.processRequest(b'INDEX|pckg|dep1,,dep2'), PackageIndexer.RES_ERROR)
+        self.assertEqual(self.indexer.processRequest(b'INDEX|pckg|dep,'), PackageIndexer.RES_ERROR_NL)
+        self.assertEqual(self.indexer.processRequest(b'INDEX|pckg|dep1,,dep2'), PackageIndexer.RES_ERROR_NL)
 
         # Dependencies specified for non-INDEX commands.
-        self.assertEqual(self.indexer.processRequest(b'REMOVE|pckg|dep'), PackageIndexer.RES_ERROR)
-        self.assertEqual(self.indexer.processRequest(b'QUERY|pckg|dep'), PackageIndexer.RES_ERROR)
+        self.assertEqual(self.indexer.processRequest(b'REMOVE|pckg|dep'), PackageIndexer.RES_ERROR_NL)
+        self.assertEqual(self.indexer.processRequest(b'QUERY|pckg|dep'), PackageIndexer.RES_ERROR_NL)
 
 
     @patch.object(PackageIndexer, 'indexPackage', return_value = 'retVal')
@@ -171,112 +189,121 @@ class PackageIndexerTest(unittest.TestCase):
         self.assertTrue(self.indexer.isPackageNameValid('packageName'))
         self.assertTrue(self.indexer.isPackageNameValid('package-name'))
         self.assertTrue(self.indexer.isPackageNameValid('package_name'))
+        self.assertTrue(self.indexer.isPackageNameValid('package.name'))
+
+        # Names containing bytes outside [A-Za-z0-9._-] are invalid.
+        self.assertFalse(self.indexer.isPackageNameValid(' '))
+        self.assertFalse(self.indexer.isPackageNameValid('package name'))
+        self.assertFalse(self.indexer.isPackageNameValid('package|name'))
+        self.assertFalse(self.indexer.isPackageNameValid('package,name'))
+        self.assertFalse(self.indexer.isPackageNameValid(b'package\nname'))
+        self.assertFalse(self.indexer.isPackageNameValid(b'package\xffname'))
 
 
     def testCommandSequence_TwoPackages(self):
         # No packages indexed.
-        self.assertEqual(self.indexer.queryPackage(b'pckg'), PackageIndexer.RES_FAIL)
-        self.assertEqual(self.indexer.removePackage(b'pckg'), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.queryPackage(b'pckg'), PackageIndexer.RES_FAIL_NL)
+        self.assertEqual(self.indexer.removePackage(b'pckg'), PackageIndexer.RES_OK_NL)
 
         # Indexing 1st package.
-        self.assertEqual(self.indexer.indexPackage(b'pckg1', {b'pckg1'}), PackageIndexer.RES_FAIL)
+        self.assertEqual(self.indexer.indexPackage(b'pckg1', {b'pckg1'}), PackageIndexer.RES_FAIL_NL)
         self.assertEqual(self.indexer.numIndexedPackages(), 0)
-        self.assertEqual(self.indexer.indexPackage(b'pckg1', {b'pckg2'}), PackageIndexer.RES_FAIL)
+        self.assertEqual(self.indexer.indexPackage(b'pckg1', {b'pckg2'}), PackageIndexer.RES_FAIL_NL)
         self.assertEqual(self.indexer.numIndexedPackages(), 0)
-        self.assertEqual(self.indexer.indexPackage(b'pckg1', set()), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.indexPackage(b'pckg1', set()), PackageIndexer.RES_OK_NL)
         self.assertEqual(self.indexer.numIndexedPackages(), 1)
-        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_OK)
-        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_FAIL)
-        self.assertEqual(self.indexer.removePackage(b'pckg2'), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_OK_NL)
+        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_FAIL_NL)
+        self.assertEqual(self.indexer.removePackage(b'pckg2'), PackageIndexer.RES_OK_NL)
 
         # Indexing 2nd package.
-        self.assertEqual(self.indexer.indexPackage(b'pckg2', {b'pckg3'}), PackageIndexer.RES_FAIL)
-        self.assertEqual(self.indexer.indexPackage(b'pckg2', {b'pckg1', b'pckg3'}), PackageIndexer.RES_FAIL)
-        self.assertEqual(self.indexer.indexPackage(b'pckg2', set()), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.indexPackage(b'pckg2', {b'pckg3'}), PackageIndexer.RES_FAIL_NL)
+        self.assertEqual(self.indexer.indexPackage(b'pckg2', {b'pckg1', b'pckg3'}), PackageIndexer.RES_FAIL_NL)
+        self.assertEqual(self.indexer.indexPackage(b'pckg2', set()), PackageIndexer.RES_OK_NL)
         self.assertEqual(self.indexer.numIndexedPackages(), 2)
-        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_OK)
-        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_OK_NL)
+        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_OK_NL)
 
         # Removing the 1st package.
-        self.assertEqual(self.indexer.removePackage(b'pckg1'), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.removePackage(b'pckg1'), PackageIndexer.RES_OK_NL)
         self.assertEqual(self.indexer.numIndexedPackages(), 1)
-        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_FAIL)
-        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_FAIL_NL)
+        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_OK_NL)
 
         # Re-adding the 2nd package.
-        self.assertEqual(self.indexer.indexPackage(b'pckg2', {b'pckg1'}), PackageIndexer.RES_FAIL)
-        self.assertEqual(self.indexer.indexPackage(b'pckg2', set()), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.indexPackage(b'pckg2', {b'pckg1'}), PackageIndexer.RES_FAIL_NL)
+        self.assertEqual(self.indexer.indexPackage(b'pckg2', set()), PackageIndexer.RES_OK_NL)
         self.assertEqual(self.indexer.numIndexedPackages(), 1)
-        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_FAIL)
-        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_FAIL_NL)
+        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_OK_NL)
 
         # Adding the 1st package with 1 dependency.
-        self.assertEqual(self.indexer.indexPackage(b'pckg1', {b'pckg2'}), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.indexPackage(b'pckg1', {b'pckg2'}), PackageIndexer.RES_OK_NL)
         self.assertEqual(self.indexer.numIndexedPackages(), 2)
-        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_OK)
-        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_OK)
-        self.assertEqual(self.indexer.removePackage(b'pckg2'), PackageIndexer.RES_FAIL)  # 'pckg1' depends on 'pckg2'
-        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_OK)
-        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_OK_NL)
+        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_OK_NL)
+        self.assertEqual(self.indexer.removePackage(b'pckg2'), PackageIndexer.RES_FAIL_NL)  # 'pckg1' depends on 'pckg2'
+        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_OK_NL)
+        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_OK_NL)
 
         # Removing the 1st package.
-        self.assertEqual(self.indexer.removePackage(b'pckg1'), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.removePackage(b'pckg1'), PackageIndexer.RES_OK_NL)
         self.assertEqual(self.indexer.numIndexedPackages(), 1)
-        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_FAIL)
-        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_OK)
-        self.assertEqual(self.indexer.removePackage(b'pckg1'), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_FAIL_NL)
+        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_OK_NL)
+        self.assertEqual(self.indexer.removePackage(b'pckg1'), PackageIndexer.RES_OK_NL)
         self.assertEqual(self.indexer.numIndexedPackages(), 1)
 
         # Removing the 2nd package.
-        self.assertEqual(self.indexer.removePackage(b'pckg2'), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.removePackage(b'pckg2'), PackageIndexer.RES_OK_NL)
         self.assertEqual(self.indexer.numIndexedPackages(), 0)
-        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_FAIL)
-        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_FAIL)
-        self.assertEqual(self.indexer.removePackage(b'pckg1'), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_FAIL_NL)
+        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_FAIL_NL)
+        self.assertEqual(self.indexer.removePackage(b'pckg1'), PackageIndexer.RES_OK_NL)
         self.assertEqual(self.indexer.numIndexedPackages(), 0)
 
 
     def testCommandSequence_FourPackages(self):
-        self.assertEqual(self.indexer.indexPackage(b'pckg1', set()), PackageIndexer.RES_OK)
-        self.assertEqual(self.indexer.indexPackage(b'pckg2', {b'pckg1'}), PackageIndexer.RES_OK)
-        self.assertEqual(self.indexer.indexPackage(b'pckg3', {b'pckg1', b'pckg2'}), PackageIndexer.RES_OK)
-        self.assertEqual(self.indexer.indexPackage(b'pckg4', {b'pckg2', b'pckg3'}), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.indexPackage(b'pckg1', set()), PackageIndexer.RES_OK_NL)
+        self.assertEqual(self.indexer.indexPackage(b'pckg2', {b'pckg1'}), PackageIndexer.RES_OK_NL)
+        self.assertEqual(self.indexer.indexPackage(b'pckg3', {b'pckg1', b'pckg2'}), PackageIndexer.RES_OK_NL)
+        self.assertEqual(self.indexer.indexPackage(b'pckg4', {b'pckg2', b'pckg3'}), PackageIndexer.RES_OK_NL)
 
         self.assertEqual(self.indexer.numIndexedPackages(), 4)
-        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_OK)
-        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_OK)
-        self.assertEqual(self.indexer.queryPackage(b'pckg3'), PackageIndexer.RES_OK)
-        self.assertEqual(self.indexer.queryPackage(b'pckg4'), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_OK_NL)
+        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_OK_NL)
+        self.assertEqual(self.indexer.queryPackage(b'pckg3'), PackageIndexer.RES_OK_NL)
+        self.assertEqual(self.indexer.queryPackage(b'pckg4'), PackageIndexer.RES_OK_NL)
 
         # Trying to remove a package on which another package depends should fail.
-        self.assertEqual(self.indexer.removePackage(b'pckg1'), PackageIndexer.RES_FAIL)
-        self.assertEqual(self.indexer.removePackage(b'pckg2'), PackageIndexer.RES_FAIL)
-        self.assertEqual(self.indexer.removePackage(b'pckg3'), PackageIndexer.RES_FAIL)
+        self.assertEqual(self.indexer.removePackage(b'pckg1'), PackageIndexer.RES_FAIL_NL)
+        self.assertEqual(self.indexer.removePackage(b'pckg2'), PackageIndexer.RES_FAIL_NL)
+        self.assertEqual(self.indexer.removePackage(b'pckg3'), PackageIndexer.RES_FAIL_NL)
         self.assertEqual(self.indexer.numIndexedPackages(), 4)
 
         # Updating package dependencies.
-        self.assertEqual(self.indexer.indexPackage(b'pckg4', {b'pckg1', b'pckg2', b'pckg4'}), PackageIndexer.RES_FAIL)
-        self.assertEqual(self.indexer.indexPackage(b'pckg4', {b'pckg1', b'pckg2'}), PackageIndexer.RES_OK)
-        self.assertEqual(self.indexer.removePackage(b'pckg1'), PackageIndexer.RES_FAIL)
-        self.assertEqual(self.indexer.removePackage(b'pckg2'), PackageIndexer.RES_FAIL)
-        self.assertEqual(self.indexer.removePackage(b'pckg3'), PackageIndexer.RES_OK)  # No longer a dependency.
-        self.assertEqual(self.indexer.queryPackage(b'pckg3'), PackageIndexer.RES_FAIL)
+        self.assertEqual(self.indexer.indexPackage(b'pckg4', {b'pckg1', b'pckg2', b'pckg4'}), PackageIndexer.RES_FAIL_NL)
+        self.assertEqual(self.indexer.indexPackage(b'pckg4', {b'pckg1', b'pckg2'}), PackageIndexer.RES_OK_NL)
+        self.assertEqual(self.indexer.removePackage(b'pckg1'), PackageIndexer.RES_FAIL_NL)
+        self.assertEqual(self.indexer.removePackage(b'pckg2'), PackageIndexer.RES_FAIL_NL)
+        self.assertEqual(self.indexer.removePackage(b'pckg3'), PackageIndexer.RES_OK_NL)  # No longer a dependency.
+        self.assertEqual(self.indexer.queryPackage(b'pckg3'), PackageIndexer.RES_FAIL_NL)
         self.assertEqual(self.indexer.numIndexedPackages(), 3)
 
         # Removing 4th package.
-        self.assertEqual(self.indexer.removePackage(b'pckg4'), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.removePackage(b'pckg4'), PackageIndexer.RES_OK_NL)
         self.assertEqual(self.indexer.numIndexedPackages(), 2)
-        self.assertEqual(self.indexer.queryPackage(b'pckg4'), PackageIndexer.RES_FAIL)
+        self.assertEqual(self.indexer.queryPackage(b'pckg4'), PackageIndexer.RES_FAIL_NL)
 
         # Removing remaining packages.
-        self.assertEqual(self.indexer.removePackage(b'pckg1'), PackageIndexer.RES_FAIL)
-        self.assertEqual(self.indexer.removePackage(b'pckg2'), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.removePackage(b'pckg1'), PackageIndexer.RES_FAIL_NL)
+        self.assertEqual(self.indexer.removePackage(b'pckg2'), PackageIndexer.RES_OK_NL)
         self.assertEqual(self.indexer.numIndexedPackages(), 1)
-        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_FAIL)
+        self.assertEqual(self.indexer.queryPackage(b'pckg2'), PackageIndexer.RES_FAIL_NL)
 
-        self.assertEqual(self.indexer.removePackage(b'pckg1'), PackageIndexer.RES_OK)
+        self.assertEqual(self.indexer.removePackage(b'pckg1'), PackageIndexer.RES_OK_NL)
         self.assertEqual(self.indexer.numIndexedPackages(), 0)
-        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_FAIL)
+        self.assertEqual(self.indexer.queryPackage(b'pckg1'), PackageIndexer.RES_FAIL_NL)
 
 
 if __name__ == '__main__':
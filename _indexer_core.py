@@ -0,0 +1,206 @@
+'''Pure request-processing logic for the package indexer.
+
+This module is deliberately free of socket and event-loop concerns: it operates on bytes in, bytes out, with full
+type annotations, so it can be AOT-compiled with mypyc (`mypyc _indexer_core.py`) for a substantial speedup of the
+CPU portion of request handling. It remains fully functional as plain Python when not compiled.'''
+
+import functools
+from collections import defaultdict
+from threading import Lock
+from typing import AbstractSet
+
+
+# Request message formatting parameters.
+REQ_TOKEN_SEPARATOR = b'|'
+REQ_DEPS_SEPARATOR = b','
+
+# Request commands.
+CMD_INDEX = b'INDEX'
+CMD_REMOVE = b'REMOVE'
+CMD_QUERY = b'QUERY'
+
+# Responses. Only three responses exist, so the newline-terminated wire forms are pre-encoded once and handlers
+# return them directly, avoiding a bytes concatenation per request.
+RES_OK = b'OK'
+RES_FAIL = b'FAIL'
+RES_ERROR = b'ERROR'
+RES_OK_NL = RES_OK + b'\n'
+RES_FAIL_NL = RES_FAIL + b'\n'
+RES_ERROR_NL = RES_ERROR + b'\n'
+
+# This is a hash map from each indexed package to its set of dependencies.
+PACKAGES: dict[bytes, AbstractSet[bytes]] = {}
+
+# This is a hash map from each indexed package to the number of packages which depend on it. Only the count is
+# needed to decide whether a package may be removed, so the full dependent sets are not kept. A defaultdict lets
+# the increment path skip the missing-key branch; reads must use get() so they do not insert empty entries.
+DEP_COUNT: defaultdict[bytes, int] = defaultdict(int)
+
+
+# Mutations of a single package's entries are serialized by a striped lock chosen by the package name's hash,
+# so INDEX/REMOVE commands touching unrelated packages proceed in parallel.
+N_STRIPES = 64  # This should be a power of 2 for best performance.
+STRIPE_LOCKS = [Lock() for _ in range(N_STRIPES)]
+
+
+def acquireStripes(names: AbstractSet[bytes]) -> list[int]:
+    '''Acquires the stripe locks covering the passed package names and returns their indices.
+
+    The locks are always acquired in sorted index order to avoid deadlock between concurrent mutators.'''
+
+    stripes = sorted({hash(name) % N_STRIPES for name in names})
+    for stripe in stripes:
+        STRIPE_LOCKS[stripe].acquire()
+    return stripes
+
+
+def releaseStripes(stripes: list[int]) -> None:
+    for stripe in reversed(stripes):
+        STRIPE_LOCKS[stripe].release()
+
+
+def acquireStripesForUpdate(name: bytes, deps: AbstractSet[bytes]) -> tuple[list[int], AbstractSet[bytes]]:
+    '''Acquires the stripe locks covering the package, the passed dependencies, and the package's current
+    dependencies, and returns the stripes together with the current dependency set.
+
+    Every dependency whose refcount an update may touch must have its stripe held, including the current
+    dependencies that are about to be dropped. The current set can only be read before the locks are held, so it
+    is re-read after acquiring and the acquisition retried if a concurrent update changed it in the meantime.'''
+
+    while True:
+        oldDeps = PACKAGES.get(name, frozenset())
+        stripes = acquireStripes(deps | oldDeps | {name})
+        if PACKAGES.get(name, frozenset()) == oldDeps:
+            return stripes, oldDeps
+        releaseStripes(stripes)
+
+
+def decrementDepCount(dep: bytes) -> None:
+    '''Drops one reference on the passed package, deleting its entry when no dependents remain.'''
+
+    DEP_COUNT[dep] -= 1
+    if DEP_COUNT[dep] == 0:
+        del DEP_COUNT[dep]
+
+
+# Package names are deduplicated through this pool, so the index and all requests share a single bytes object per
+# distinct name. This cuts memory on real package graphs, where the same names recur many times, and lets dict and
+# set probes hit the identity fast path instead of comparing bytes.
+_NAME_POOL: dict[bytes, bytes] = {}
+
+
+def internName(name: bytes) -> bytes:
+    '''Returns the pooled instance of the passed package name, adding it to the pool on first sight.
+
+    Only names the index is about to retain may be interned: the pool has no eviction, so pooling names from
+    malformed requests — or from queries for names that were never indexed — would retain arbitrary client
+    garbage forever.'''
+
+    return _NAME_POOL.setdefault(name, name)
+
+
+@functools.lru_cache(maxsize = 4096)
+def internDeps(deps: frozenset[bytes]) -> frozenset[bytes]:
+    '''Returns a frozenset with every dependency name replaced by its pooled instance.
+
+    Memoized on the (hashable) input set, so repeat submissions of the same dependency list share one interned
+    set. Callers must only pass validated dependency sets; see internName.'''
+
+    return frozenset(internName(dep) for dep in deps)
+
+
+@functools.lru_cache(maxsize = 4096)
+def parseDepsToken(depsToken: bytes) -> frozenset[bytes]:
+    '''Returns a frozenset containing all dependencies in the passed token.
+
+    Clients often re-INDEX a package with an identical dependency string, so results are memoized on the raw
+    token. The returned frozenset is immutable and safe to share between requests; the names are not interned
+    here since they have not been validated yet.'''
+
+    if len(depsToken) == 0:
+        return frozenset()  # No dependencies.
+    return frozenset(depsToken.split(REQ_DEPS_SEPARATOR))
+
+
+# The bytes allowed in package and dependency names.
+_ALLOWED_NAME_BYTES = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789._-'
+
+
+def isPackageNameValid(name: bytes) -> bool:
+    '''Returns whether the passed name is non-empty and contains only allowed bytes.
+
+    translate with a delete table classifies the whole name in one C call: deleting every allowed byte leaves an
+    empty result exactly when no disallowed byte was present. This avoids a Python-level loop over the name.'''
+
+    return len(name) > 0 and len(name.translate(None, _ALLOWED_NAME_BYTES)) == 0
+
+
+def indexPackage(name: bytes, deps: AbstractSet[bytes]) -> bytes:
+    '''Handler function for the INDEX command.'''
+
+    stripes, oldDeps = acquireStripesForUpdate(name, deps)
+    try:
+        # Check that the package does not depend on itself: one hash probe instead of comparing the name against
+        # every dependency inside the loop below.
+        if name in deps:
+            return RES_FAIL_NL
+
+        # Check that every package dependency is indexed.
+        for dep in deps:
+            if dep not in PACKAGES:
+                return RES_FAIL_NL
+
+        # INDEX is the only command whose names the index retains, so interning happens here and nowhere else:
+        # QUERY and REMOVE probe their name once and discard it, and pooling it would grow the no-eviction pool
+        # without bound. The frozenset() call is an identity operation when deps is already a frozenset.
+        name = internName(name)
+        deps = internDeps(frozenset(deps))
+
+        # Iterating the existing sets and testing membership directly avoids materializing a set difference (and
+        # re-hashing its elements) on every update.
+
+        # Drop the reference on the packages on which this package no longer depends. Their stripes are held: the
+        # acquisition above covered the current dependency set as well.
+        for dep in oldDeps:
+            if dep not in deps:
+                decrementDepCount(dep)
+
+        # Index the package or update its set of dependecies.
+        PACKAGES[name] = deps
+
+        # Add a reference on the packages on which this package newly depends.
+        for dep in deps:
+            if dep not in oldDeps:
+                DEP_COUNT[dep] += 1
+
+        return RES_OK_NL
+    finally:
+        releaseStripes(stripes)
+
+
+def removePackage(name: bytes) -> bytes:
+    '''Handler function for the REMOVE command.'''
+
+    stripes, _ = acquireStripesForUpdate(name, frozenset())
+    try:
+        if name not in PACKAGES:
+            return RES_OK_NL  # Package is not indexed.
+        if DEP_COUNT.get(name, 0) > 0:
+            return RES_FAIL_NL  # Other package(s) depend on this package.
+
+        # Remove the package from the index and drop its reference on each of its dependencies.
+        for dep in PACKAGES[name]:
+            decrementDepCount(dep)
+        del PACKAGES[name]
+
+        return RES_OK_NL
+    finally:
+        releaseStripes(stripes)
+
+
+def queryPackage(name: bytes) -> bytes:
+    '''Handler function for the QUERY command.'''
+
+    # A dict membership probe is atomic under the GIL, so queries take no lock at all and never serialize behind
+    # mutators or each other.
+    return RES_OK_NL if name in PACKAGES else RES_FAIL_NL